@@ -0,0 +1,101 @@
+"""Gunicorn settings for running the API with several Uvicorn workers.
+
+    gunicorn server:app -c gunicorn.conf.py
+
+WEB_CONCURRENCY sets the number of workers. The default is one per CPU the
+container may use (its cgroup CPU quota, else the CPU affinity), capped at
+MAX_DEFAULT_WORKERS (4): every worker opens its own Supabase connection pool
+(SUPABASE_MAX_CONNECTIONS), so the worker count multiplies the connections.
+Workers are recycled after MAX_REQUESTS requests (plus jitter, so they do not
+all restart at once) and get GRACEFUL_TIMEOUT seconds to finish in-flight
+requests on restart or deploy. When shutdown starts the worker ends open
+/api/changes streams (clients reconnect elsewhere), and connections still
+open a few seconds before the deadline are cancelled, so the app's shutdown
+hooks (flushing buffered writes) always run before gunicorn would kill it.
+"""
+import os
+import secrets
+import shutil
+import sys
+import tempfile
+
+from gunicorn.arbiter import Arbiter
+from uvicorn.server import Server
+from uvicorn.workers import UvicornWorker
+
+
+def cgroup_cpu_quota():
+    """CPUs allowed by the cgroup v2 (cpu.max) or v1 (cfs quota/period) limit, or None if unlimited"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        try:
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                quota = f.read().strip()
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = f.read().strip()
+        except OSError:
+            return None
+    if quota in ('max', '-1'):
+        return None
+    return max(1, int(int(quota) / int(period)))
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota()
+    return min(cpus, quota) if quota else cpus
+
+
+class DrainingServer(Server):
+    async def shutdown(self, sockets=None):
+        drain = getattr(getattr(self.config.app, 'state', None), 'drain', None)
+        if drain is not None:
+            drain()
+        await super().shutdown(sockets)
+
+
+class Worker(UvicornWorker):
+    async def _serve(self) -> None:
+        self.config.app = self.wsgi
+        self.config.timeout_graceful_shutdown = max(1, self.cfg.graceful_timeout - 5)
+        server = DrainingServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', min(available_cpus(), int(os.environ.get('MAX_DEFAULT_WORKERS', '4')))))
+worker_class = Worker
+max_requests = int(os.environ.get('MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.environ.get('MAX_REQUESTS_JITTER', '1000'))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', '30'))
+timeout = int(os.environ.get('WORKER_TIMEOUT', '60'))
+keepalive = int(os.environ.get('KEEPALIVE', '5'))
+forwarded_allow_ips = os.environ.get('FORWARDED_ALLOW_IPS', '*')
+
+# Set in the master before forking so every worker inherits them:
+# the shared version file that keeps the workers' caches coherent, and a token
+# secret all workers agree on (set ADMIN_TOKEN_SECRET to keep tokens valid across deploys)
+if workers > 1:
+    state_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    os.environ.setdefault('SHARED_STATE_PATH', os.path.join(state_dir, f'bloom-api-{os.getpid()}.state'))
+    os.environ.setdefault('ADMIN_TOKEN_SECRET', secrets.token_urlsafe(32))
+
+
+def on_exit(server):
+    """Remove the shared state files once the master stops"""
+    path = os.environ.get('SHARED_STATE_PATH')
+    if workers > 1 and path:
+        for suffix in ('', '.revoked', '.revoked.lock', '.buckets'):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+        shutil.rmtree(path + '.workers', ignore_errors=True)
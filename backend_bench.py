@@ -0,0 +1,366 @@
+"""Load-test and benchmark harness for the Bloom Agriculture API.
+
+Runs the FastAPI app in-process (httpx ASGI transport) or under uvicorn
+against the SQLite storage backend, drives a seeded mix of concurrent
+requests and writes throughput and p50/p95/p99 latency per endpoint as JSON.
+
+    python backend_bench.py --output bench.json
+    python backend_bench.py --mode uvicorn --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+
+# Relative weights of each scenario in the generated schedule
+DEFAULT_MIX = {
+    'gallery_list': 30,
+    'gallery_category': 10,
+    'gallery_item': 10,
+    'events_list': 20,
+    'events_filtered': 10,
+    'events_item': 8,
+    'contact_burst': 4,
+    'admin_dashboard': 3,
+    'status_post': 5,
+}
+
+# Categories used by the /api/seed data, plus one with no matches
+GALLERY_CATEGORIES = ['products', 'projects', 'training', 'success-stories', 'services', 'farms', 'archive']
+EVENT_CATEGORIES = ['workshop', 'seminar', 'exhibition', 'archive']
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(values) + 0.5)))
+    return values[min(rank, len(values)) - 1]
+
+
+def git_revision():
+    """Current commit and whether the working tree has local changes"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def bench_environment(workdir):
+    """Environment for a throwaway local deployment of the API"""
+    return {
+        'STORAGE_BACKEND': 'sqlite',
+        'SQLITE_PATH': os.path.join(workdir, 'bench.db'),
+        'CONTACT_SPOOL_PATH': os.path.join(workdir, 'contact_spool.jsonl'),
+        'IMAGE_CACHE_DIR': os.path.join(workdir, 'image_cache'),
+        # Every request comes from one address; keep the limiter in the path without throttling the run
+        'CONTACT_RATE_PER_IP': '1000000/1',
+        'CONTACT_RATE_GLOBAL': '1000000/1',
+        'STATUS_RATE_PER_IP': '1000000/1',
+        'STATUS_RATE_GLOBAL': '1000000/1',
+        'SUPABASE_URL': os.environ.get('SUPABASE_URL', 'http://localhost'),
+        'SUPABASE_KEY': os.environ.get('SUPABASE_KEY', 'bench'),
+    }
+
+
+class BenchmarkRunner:
+    def __init__(self, client, seed=42, concurrency=16, requests=2000, warmup=200, mix=None):
+        self.client = client
+        self.seed = seed
+        self.concurrency = concurrency
+        self.requests = requests
+        self.warmup = warmup
+        self.mix = mix or DEFAULT_MIX
+        self.gallery_ids = []
+        self.event_ids = []
+        self.token = None
+        self.samples = {}
+        self.errors = {}
+        self.recording = False
+
+    async def call(self, name, method, path, **kwargs):
+        """Issue one request and record its latency under name"""
+        headers = kwargs.pop('headers', {})
+        if self.token:
+            headers.setdefault('Authorization', f'Bearer {self.token}')
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, f"/api{path}", headers=headers, **kwargs)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            response = None
+            failed = True
+        elapsed = time.perf_counter() - start
+        if self.recording:
+            self.samples.setdefault(name, []).append(elapsed)
+            if failed:
+                self.errors[name] = self.errors.get(name, 0) + 1
+        return response
+
+    async def setup(self):
+        """Seed the database and collect ids for item lookups"""
+        await self.call('seed', 'POST', '/seed')
+        gallery = await self.call('setup', 'GET', '/gallery')
+        events = await self.call('setup', 'GET', '/events')
+        self.gallery_ids = [item['id'] for item in gallery.json()] if gallery is not None else []
+        self.event_ids = [item['id'] for item in events.json()] if events is not None else []
+        response = await self.call('setup', 'POST', '/admin/login', json={
+            'username': os.environ.get('BENCH_ADMIN_USERNAME', 'admin'),
+            'password': os.environ.get('BENCH_ADMIN_PASSWORD', 'bloom2024'),
+        })
+        if response is not None and response.status_code == 200:
+            self.token = response.json().get('token')
+
+    def schedule(self, count, rng):
+        """Deterministic list of (scenario, argument) pairs for a run"""
+        names = sorted(self.mix)
+        weights = [self.mix[name] for name in names]
+        plan = []
+        for scenario in rng.choices(names, weights=weights, k=count):
+            if scenario == 'gallery_category':
+                plan.append((scenario, rng.choice(GALLERY_CATEGORIES)))
+            elif scenario == 'gallery_item':
+                plan.append((scenario, rng.choice(self.gallery_ids) if self.gallery_ids else None))
+            elif scenario == 'events_filtered':
+                plan.append((scenario, rng.choice([f'category={rng.choice(EVENT_CATEGORIES)}', 'featured_only=true', 'active_only=true'])))
+            elif scenario == 'events_item':
+                plan.append((scenario, rng.choice(self.event_ids) if self.event_ids else None))
+            elif scenario == 'contact_burst':
+                plan.append((scenario, rng.randint(3, 8)))
+            elif scenario == 'status_post':
+                plan.append((scenario, f"bench-client-{rng.randint(1, 20)}"))
+            else:
+                plan.append((scenario, None))
+        return plan
+
+    async def run_scenario(self, scenario, argument, sequence):
+        if scenario == 'gallery_list':
+            await self.call('GET /gallery', 'GET', '/gallery')
+        elif scenario == 'gallery_category':
+            await self.call('GET /gallery?category', 'GET', f'/gallery?category={argument}')
+        elif scenario == 'gallery_item' and argument:
+            await self.call('GET /gallery/{id}', 'GET', f'/gallery/{argument}')
+        elif scenario == 'events_list':
+            await self.call('GET /events', 'GET', '/events')
+        elif scenario == 'events_filtered':
+            await self.call('GET /events?filter', 'GET', f'/events?{argument}')
+        elif scenario == 'events_item' and argument:
+            await self.call('GET /events/{id}', 'GET', f'/events/{argument}')
+        elif scenario == 'contact_burst':
+            await asyncio.gather(*[
+                self.call('POST /contact', 'POST', '/contact', json={
+                    'name': f'Bench Visitor {sequence}-{i}',
+                    'email': f'visitor{sequence}.{i}@example.com',
+                    'message': 'Benchmark enquiry about produce availability.',
+                })
+                for i in range(argument)
+            ])
+        elif scenario == 'admin_dashboard':
+            await asyncio.gather(
+                self.call('GET /admin/stats', 'GET', '/admin/stats'),
+                self.call('GET /contact', 'GET', '/contact?limit=50'),
+                self.call('GET /events', 'GET', '/events'),
+                self.call('GET /gallery', 'GET', '/gallery'),
+            )
+        elif scenario == 'status_post':
+            await self.call('POST /status', 'POST', '/status', json={'client_name': argument})
+
+    async def drive(self, plan):
+        """Run the plan with a fixed number of concurrent workers"""
+        queue = list(enumerate(plan))
+        queue.reverse()
+
+        async def worker():
+            while queue:
+                sequence, (scenario, argument) = queue.pop()
+                await self.run_scenario(scenario, argument, sequence)
+
+        await asyncio.gather(*[worker() for _ in range(self.concurrency)])
+
+    async def run(self):
+        await self.setup()
+        rng = random.Random(self.seed)
+        if self.warmup:
+            await self.drive(self.schedule(self.warmup, rng))
+        plan = self.schedule(self.requests, rng)
+        self.recording = True
+        start = time.perf_counter()
+        await self.drive(plan)
+        duration = time.perf_counter() - start
+        self.recording = False
+        return self.report(duration, len(plan))
+
+    def report(self, duration, scenarios):
+        endpoints = {}
+        total = 0
+        for name, samples in sorted(self.samples.items()):
+            samples.sort()
+            total += len(samples)
+            endpoints[name] = {
+                'count': len(samples),
+                'errors': self.errors.get(name, 0),
+                'throughput_rps': round(len(samples) / duration, 2) if duration else 0.0,
+                'mean_ms': round(sum(samples) / len(samples) * 1000, 3),
+                'p50_ms': round(percentile(samples, 50) * 1000, 3),
+                'p95_ms': round(percentile(samples, 95) * 1000, 3),
+                'p99_ms': round(percentile(samples, 99) * 1000, 3),
+                'max_ms': round(samples[-1] * 1000, 3),
+            }
+        return {
+            'totals': {
+                'scenarios': scenarios,
+                'requests': total,
+                'errors': sum(self.errors.values()),
+                'duration_s': round(duration, 3),
+                'throughput_rps': round(total / duration, 2) if duration else 0.0,
+            },
+            'endpoints': endpoints,
+        }
+
+
+async def run_in_process(args, workdir):
+    """Import the app with a local environment and drive it over the ASGI transport"""
+    os.environ.update(bench_environment(workdir))
+    sys.path.insert(0, BACKEND_DIR)
+    import server
+
+    async with server.app.router.lifespan_context(server.app):
+        while not server.readiness.ready:
+            await asyncio.sleep(0.05)
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            runner = BenchmarkRunner(client, args.seed, args.concurrency, args.requests, args.warmup)
+            return await runner.run()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(client, process, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+        try:
+            response = await client.get('/api/health/ready')
+            if response.status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("API did not become ready in time")
+
+
+async def run_under_uvicorn(args, workdir):
+    """Start uvicorn in a subprocess and drive it over loopback HTTP"""
+    port = free_port()
+    env = dict(os.environ, **bench_environment(workdir))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'server:app', '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency * 8, max_keepalive_connections=args.concurrency * 8)
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', limits=limits, timeout=30.0) as client:
+            await wait_until_ready(client, process)
+            runner = BenchmarkRunner(client, args.seed, args.concurrency, args.requests, args.warmup)
+            return await runner.run()
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def compare(result, baseline, threshold):
+    """List regressions beyond threshold (a fraction) against a baseline run"""
+    regressions = []
+    for key in ('mode', 'concurrency', 'seed'):
+        if baseline.get('meta', {}).get(key) != result['meta'][key]:
+            print(f"Warning: baseline {key} differs ({baseline.get('meta', {}).get(key)} vs {result['meta'][key]})", file=sys.stderr)
+    for name, current in result['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if previous[metric] and current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(f"{name} {metric}: {previous[metric]:.3f} -> {current[metric]:.3f}")
+        if current['errors'] > previous.get('errors', 0):
+            regressions.append(f"{name} errors: {previous.get('errors', 0)} -> {current['errors']}")
+    previous_rps = baseline.get('totals', {}).get('throughput_rps')
+    if previous_rps and result['totals']['throughput_rps'] < previous_rps * (1 - threshold):
+        regressions.append(f"throughput_rps: {previous_rps:.2f} -> {result['totals']['throughput_rps']:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Bloom Agriculture API")
+    parser.add_argument('--mode', choices=['inprocess', 'uvicorn'], default='inprocess')
+    parser.add_argument('--requests', type=int, default=2000, help="scenarios to run after warm-up")
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    parser.add_argument('--compare', help="baseline JSON report to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.15, help="allowed slowdown as a fraction (default 0.15)")
+    args = parser.parse_args()
+
+    commit, dirty = git_revision()
+    with tempfile.TemporaryDirectory(prefix='bloom-bench-') as workdir:
+        runner = run_in_process if args.mode == 'inprocess' else run_under_uvicorn
+        result = asyncio.run(runner(args, workdir))
+
+    report = {
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'mode': args.mode,
+            'seed': args.seed,
+            'concurrency': args.concurrency,
+            'warmup': args.warmup,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+        },
+        **result,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions against {baseline.get('meta', {}).get('commit')}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {baseline.get('meta', {}).get('commit')}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
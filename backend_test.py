@@ -180,8 +180,9 @@ def main():
         # Test main endpoints
         tester.test_gallery_endpoints()
         tester.test_events_endpoints()
-        tester.test_contact_endpoints()
+        # Log in before the contact tests: listing messages needs the admin token
         tester.test_admin_endpoints()
+        tester.test_contact_endpoints()
         tester.test_status_endpoints()
         
     except Exception as e:
@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+# The suite runs the app in-process against a throwaway SQLite database
+os.environ.setdefault('STORAGE_BACKEND', 'sqlite')
+os.environ.setdefault('SQLITE_PATH', os.path.join(tempfile.mkdtemp(), 'test.db'))
+os.environ.setdefault('IMAGE_CACHE_DIR', os.path.join(tempfile.mkdtemp(), 'image_cache'))
+os.environ.setdefault('ADMIN_LOGIN_RATE_PER_IP', '1000/1')
+os.environ.setdefault('ADMIN_LOGIN_RATE_GLOBAL', '1000/1')
+os.environ.setdefault('CONTACT_RATE_PER_IP', '1000/1')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import server  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def client():
+    with TestClient(server.app) as client:
+        deadline = time.monotonic() + 10
+        while not server.readiness.ready and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert client.post('/api/seed').status_code == 200
+        yield client
+
+
+@pytest.fixture(scope='session')
+def admin_token(client):
+    response = client.post('/api/admin/login', json={'username': 'admin', 'password': 'bloom2024'})
+    assert response.status_code == 200
+    return response.json()['token']
+
+
+@pytest.fixture
+def admin_headers(admin_token):
+    return {'Authorization': f'Bearer {admin_token}'}
+
+
+class MemoryStorage(server.StorageBackend):
+    """Just enough of a backend to see exactly which rows a batch writer inserted, and how often"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self.rows = {}
+        self.inserts = 0
+
+    async def insert(self, table, rows, ignore_duplicates=False):
+        self.inserts += 1
+        written = []
+        for row in rows:
+            if row['id'] in self.rows:
+                if ignore_duplicates:
+                    continue
+                raise ValueError(f"duplicate id {row['id']}")
+            self.rows[row['id']] = row
+            written.append(row)
+        return written
+
+
+@pytest.fixture
+def memory_storage(monkeypatch):
+    backend = MemoryStorage()
+    monkeypatch.setattr(server, 'storage', backend)
+    monkeypatch.setattr(server, 'record_change', lambda *args, **kwargs: None)
+    return backend
@@ -0,0 +1,138 @@
+import json
+import time
+
+import pytest
+
+import server
+
+PROTECTED_ROUTES = [
+    ('GET', '/api/admin/stats'),
+    ('POST', '/api/admin/logout'),
+    ('POST', '/api/admin/snapshots'),
+    ('GET', '/api/contact'),
+    ('GET', '/api/contact/export'),
+    ('GET', '/api/status/export'),
+    ('PUT', '/api/contact/some-id/read'),
+    ('DELETE', '/api/contact/some-id'),
+    ('POST', '/api/gallery'),
+    ('POST', '/api/gallery/bulk'),
+    ('PUT', '/api/gallery/some-id'),
+    ('DELETE', '/api/gallery/some-id'),
+    ('POST', '/api/events'),
+    ('POST', '/api/events/bulk'),
+    ('PUT', '/api/events/some-id'),
+    ('DELETE', '/api/events/some-id'),
+    ('POST', '/api/changes/token'),
+]
+
+
+def login(client, username='admin', password='bloom2024'):
+    return client.post('/api/admin/login', json={'username': username, 'password': password})
+
+
+def test_login_returns_a_working_token(client):
+    response = login(client)
+    assert response.status_code == 200
+    body = response.json()
+    assert body['success'] and body['token'] and body['expires_at']
+    stats = client.get('/api/admin/stats', headers={'Authorization': f"Bearer {body['token']}"})
+    assert stats.status_code == 200
+
+
+@pytest.mark.parametrize('username, password', [('admin', 'wrong'), ('root', 'bloom2024'), ('', '')])
+def test_login_rejects_bad_credentials(client, username, password):
+    assert login(client, username, password).status_code == 401
+
+
+@pytest.mark.parametrize('method, path', PROTECTED_ROUTES)
+def test_protected_routes_require_a_token(client, method, path):
+    response = client.request(method, path, json={})
+    assert response.status_code == 401
+    assert response.headers['WWW-Authenticate'] == 'Bearer'
+
+
+@pytest.mark.parametrize('method, path', PROTECTED_ROUTES)
+def test_protected_routes_reject_a_bad_token(client, method, path):
+    response = client.request(method, path, json={}, headers={'Authorization': 'Bearer not-a-token'})
+    assert response.status_code == 401
+
+
+def test_public_routes_stay_open(client):
+    assert client.get('/api/gallery').status_code == 200
+    assert client.get('/api/events').status_code == 200
+    contact = {'name': 'Visitor', 'email': 'visitor@example.com', 'message': 'Hello from the test suite'}
+    assert client.post('/api/contact', json=contact).status_code == 200
+
+
+def test_tampered_tokens_are_rejected(admin_token):
+    payload, _, signature = admin_token.partition('.')
+    claims = json.loads(server.b64url_decode(payload))
+    claims['exp'] += 3600
+    forged = server.b64url_encode(json.dumps(claims).encode())
+    assert server.admin_tokens.verify(f"{forged}.{signature}") is None
+    assert server.admin_tokens.verify(f"{payload}.{signature[:-2]}AA") is None
+    assert server.admin_tokens.verify(payload) is None
+    assert server.admin_tokens.verify(admin_token) is not None
+
+
+def test_tokens_from_another_secret_are_rejected():
+    other = server.AdminTokens('another-secret', 60)
+    token, _ = other.issue('admin')
+    assert server.admin_tokens.verify(token) is None
+
+
+def test_tokens_expire(monkeypatch):
+    token, expires_at = server.admin_tokens.issue('admin', ttl=60)
+    assert server.admin_tokens.verify(token) is not None
+    monkeypatch.setattr(server.time, 'time', lambda: expires_at)
+    assert server.admin_tokens.verify(token) is None
+
+
+def test_scoped_tokens_only_work_for_their_scope(client, admin_headers):
+    response = client.post('/api/changes/token', headers=admin_headers)
+    assert response.status_code == 200
+    token = response.json()['token']
+    assert server.admin_tokens.verify(token, 'changes') is not None
+    assert server.admin_tokens.verify(token) is None
+    assert client.get('/api/contact', headers={'Authorization': f'Bearer {token}'}).status_code == 401
+
+
+def test_logout_revokes_the_token(client):
+    token = login(client).json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.post('/api/admin/logout', headers=headers).status_code == 200
+    assert client.get('/api/admin/stats', headers=headers).status_code == 401
+    assert client.post('/api/admin/logout', headers=headers).status_code == 401
+
+
+def test_revocations_are_forgotten_once_expired():
+    tokens = server.AdminTokens('secret', 60)
+    tokens.revoke('old', int(time.time()) - 1)
+    tokens.revoke('new', int(time.time()) + 60)
+    assert set(tokens.revoked) == {'new'}
+
+
+def test_password_hash_round_trip():
+    encoded = server.hash_password('s3cret', iterations=1000)
+    assert encoded.startswith('pbkdf2_sha256$1000$')
+    assert server.verify_password('s3cret', encoded)
+    assert not server.verify_password('s3cret!', encoded)
+    assert encoded != server.hash_password('s3cret', iterations=1000)  # salted
+
+
+def test_password_verify_compares_in_constant_time(monkeypatch):
+    calls = []
+    compare_digest = server.hmac.compare_digest
+
+    def spy(a, b):
+        calls.append((a, b))
+        return compare_digest(a, b)
+
+    monkeypatch.setattr(server.hmac, 'compare_digest', spy)
+    assert not server.verify_password('wrong', server.hash_password('right', iterations=1000))
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('encoded', ['', 'md5$1$salt$hash', 'pbkdf2_sha256$notanumber$c2FsdA$aGFzaA'])
+def test_malformed_hashes_never_verify(encoded):
+    assert not server.verify_password('anything', encoded)
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def recorded(memory_storage, monkeypatch):
+    changes = []
+    monkeypatch.setattr(server, 'record_change', lambda table, action, rows, *args: changes.extend(rows))
+    return changes
+
+
+def indexed(count, bad=()):
+    return [(n, {'id': f'row-{n}', 'bad': n in bad}) for n in range(count)]
+
+
+def test_chunk_that_committed_before_timing_out_succeeds(memory_storage, recorded, monkeypatch):
+    insert = memory_storage.insert
+
+    async def commit_then_time_out(table, rows, ignore_duplicates=False):
+        # A multi-row insert that commits but whose reply is lost
+        written = await insert(table, rows, ignore_duplicates)
+        if len(rows) > 1:
+            raise asyncio.TimeoutError()
+        return written
+
+    monkeypatch.setattr(memory_storage, 'insert', commit_then_time_out)
+    results = asyncio.run(server.bulk_insert('gallery', indexed(5)))
+    assert [result.success for result in results] == [True] * 5
+    assert [result.id for result in results] == [f'row-{n}' for n in range(5)]
+    assert sorted(memory_storage.rows) == [f'row-{n}' for n in range(5)]
+    # The rows the failed chunk wrote still reach the caches and counters
+    assert sorted(row['id'] for row in recorded) == sorted(memory_storage.rows)
+
+
+def test_bad_row_only_fails_itself(memory_storage, recorded, monkeypatch):
+    insert = memory_storage.insert
+
+    async def reject_bad_rows(table, rows, ignore_duplicates=False):
+        # Like a failed transaction, one bad row rejects the whole insert
+        if any(row.get('bad') for row in rows):
+            raise ValueError('constraint violated')
+        return await insert(table, rows, ignore_duplicates)
+
+    monkeypatch.setattr(memory_storage, 'insert', reject_bad_rows)
+    results = asyncio.run(server.bulk_insert('gallery', indexed(4, bad={2})))
+    assert [result.success for result in results] == [True, True, False, True]
+    assert results[2].error == 'constraint violated'
+    assert sorted(memory_storage.rows) == ['row-0', 'row-1', 'row-3']
+    assert len(recorded) == 3
+
+
+def test_bulk_route_reports_per_item_results(client, admin_headers):
+    items = [{'title': 'Bulk one', 'image_url': 'https://example.com/1.jpg'}, {'title': 'Missing image'},
+             {'title': 'Bulk two', 'image_url': 'https://example.com/2.jpg'}]
+    response = client.post('/api/gallery/bulk', json=items, headers=admin_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body['created'], body['failed']) == (2, 1)
+    assert [result['success'] for result in body['results']] == [True, False, True]
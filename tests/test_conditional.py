@@ -0,0 +1,86 @@
+import uuid
+from email.utils import formatdate
+
+import pytest
+
+import server
+
+ENCODINGS = ['br', 'gzip', 'identity']
+
+
+@pytest.fixture
+def listing(client, admin_headers):
+    """Query params for a gallery listing big enough to be compressed"""
+    category = f'etag-{uuid.uuid4().hex[:8]}'
+    for n in range(12):
+        item = {'title': f'Conditional {n}', 'description': 'x' * 100,
+                'image_url': f'https://example.com/{n}.jpg', 'category': category}
+        assert client.post('/api/gallery', json=item, headers=admin_headers).status_code == 200
+    params = {'category': category}
+    assert len(client.get('/api/gallery', params=params, headers={'Accept-Encoding': 'identity'}).content) \
+        >= server.COMPRESSION_MIN_SIZE
+    return params
+
+
+def get(client, params, encoding, **headers):
+    return client.get('/api/gallery', params=params, headers={'Accept-Encoding': encoding, **headers})
+
+
+@pytest.mark.parametrize('encoding', ENCODINGS)
+def test_each_encoding_revalidates_with_its_own_etag(client, listing, encoding):
+    response = get(client, listing, encoding)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert response.headers.get('Content-Encoding') == (None if encoding == 'identity' else encoding)
+    assert etag.endswith(f'-{encoding}"') == (encoding != 'identity')
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+    revalidated = get(client, listing, encoding, **{'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b''
+    assert revalidated.headers['ETag'] == etag
+    assert 'Content-Encoding' not in revalidated.headers
+
+
+@pytest.mark.parametrize('cached, requested', [('br', 'gzip'), ('gzip', 'br'), ('identity', 'gzip'), ('br', 'identity')])
+def test_etag_of_another_encoding_gets_a_full_response(client, listing, cached, requested):
+    etag = get(client, listing, cached).headers['ETag']
+    response = get(client, listing, requested, **{'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.json() == get(client, listing, 'identity').json()
+
+
+def test_weak_and_listed_etags_match(client, listing):
+    etag = get(client, listing, 'gzip').headers['ETag']
+    assert get(client, listing, 'gzip', **{'If-None-Match': f'W/{etag}'}).status_code == 304
+    assert get(client, listing, 'gzip', **{'If-None-Match': f'"other", {etag}'}).status_code == 304
+    assert get(client, listing, 'gzip', **{'If-None-Match': '*'}).status_code == 304
+
+
+def test_write_changes_the_etag(client, admin_headers, listing):
+    etag = get(client, listing, 'br').headers['ETag']
+    item = {'title': 'Newcomer', 'image_url': 'https://example.com/new.jpg', 'category': listing['category']}
+    assert client.post('/api/gallery', json=item, headers=admin_headers).status_code == 200
+    response = get(client, listing, 'br', **{'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_if_modified_since(client, listing):
+    response = get(client, listing, 'identity')
+    last_modified = response.headers['Last-Modified']
+    assert get(client, listing, 'identity', **{'If-Modified-Since': last_modified}).status_code == 304
+    assert get(client, listing, 'identity', **{'If-Modified-Since': formatdate(0, usegmt=True)}).status_code == 200
+    # If-None-Match takes precedence when both are sent
+    stale = {'If-None-Match': '"stale"', 'If-Modified-Since': last_modified}
+    assert get(client, listing, 'identity', **stale).status_code == 200
+
+
+def test_detail_endpoint_revalidates(client, listing):
+    item_id = get(client, listing, 'identity').json()[0]['id']
+    response = client.get(f'/api/gallery/{item_id}')
+    assert response.status_code == 200
+    revalidated = client.get(f'/api/gallery/{item_id}', headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b''
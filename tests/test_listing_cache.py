@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def selects(monkeypatch):
+    """Record the tables every storage read goes to"""
+    calls = []
+    select = server.storage.select
+
+    async def counting_select(table, *args, **kwargs):
+        calls.append(table)
+        return await select(table, *args, **kwargs)
+
+    monkeypatch.setattr(server.storage, 'select', counting_select)
+    return calls
+
+
+def new_item(category):
+    return {'title': 'Cached', 'image_url': 'https://example.com/cached.jpg', 'category': category}
+
+
+def test_repeated_listing_is_served_from_the_cache(client, selects):
+    params = {'category': f'cache-{uuid.uuid4().hex[:8]}'}
+    first = client.get('/api/gallery', params=params)
+    second = client.get('/api/gallery', params=params)
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert selects == ['gallery']
+
+
+def test_write_bumps_the_generation_and_the_next_read_sees_it(client, admin_headers, selects):
+    category = f'cache-{uuid.uuid4().hex[:8]}'
+    assert client.get('/api/gallery', params={'category': category}).json() == []
+    generation = server.listing_cache.generation('gallery')
+
+    created = client.post('/api/gallery', json=new_item(category), headers=admin_headers).json()
+    assert server.listing_cache.generation('gallery') == generation + 1
+    assert [row['id'] for row in client.get('/api/gallery', params={'category': category}).json()] == [created['id']]
+
+    client.put(f"/api/gallery/{created['id']}", json={'is_active': False}, headers=admin_headers)
+    assert server.listing_cache.generation('gallery') == generation + 2
+    assert client.get('/api/gallery', params={'category': category}).json() == []
+
+    client.delete(f"/api/gallery/{created['id']}", headers=admin_headers)
+    assert server.listing_cache.generation('gallery') == generation + 3
+    assert client.get('/api/gallery', params={'category': category, 'active_only': False}).json() == []
+
+
+def test_writes_only_invalidate_their_own_table(client, admin_headers, selects):
+    client.get('/api/events')
+    events_generation = server.listing_cache.generation('events')
+    client.post('/api/gallery', json=new_item('elsewhere'), headers=admin_headers)
+    assert server.listing_cache.generation('events') == events_generation
+    selects.clear()
+    client.get('/api/events')
+    assert selects == []
+
+
+def test_read_that_started_before_a_write_is_not_cached():
+    cache = server.ListingCache(maxsize=8, ttl=60)
+    generation = cache.generation('gallery')
+    cache.invalidate('gallery')  # a write lands while the read is in flight
+    cache.set('gallery', ('key',), 'pre-write rows', generation)
+    assert cache.get('gallery', ('key',)) is None
+    cache.set('gallery', ('key',), 'fresh rows', cache.generation('gallery'))
+    assert cache.get('gallery', ('key',)) == 'fresh rows'
+
+
+def test_invalidate_clears_only_that_table():
+    cache = server.ListingCache(maxsize=8, ttl=60)
+    cache.set('gallery', ('key',), 'gallery rows', 0)
+    cache.set('events', ('key',), 'event rows', 0)
+    cache.invalidate('gallery')
+    assert cache.get('gallery', ('key',)) is None
+    assert cache.get('events', ('key',)) == 'event rows'
+
+
+def test_zero_size_disables_the_cache():
+    cache = server.ListingCache(maxsize=0, ttl=60)
+    cache.set('gallery', ('key',), 'rows', 0)
+    assert cache.get('gallery', ('key',)) is None
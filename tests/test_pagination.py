@@ -0,0 +1,103 @@
+import uuid
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def category(client, admin_headers):
+    """A fresh gallery category holding seven items, so pages are predictable"""
+    name = f'paging-{uuid.uuid4().hex[:8]}'
+    for n in range(7):
+        item = {'title': f'Item {n}', 'image_url': f'https://example.com/{n}.jpg', 'category': name}
+        assert client.post('/api/gallery', json=item, headers=admin_headers).status_code == 200
+    return name
+
+
+def walk(client, path, params):
+    """Follow X-Next-Cursor to the end, returning every page"""
+    pages = []
+    params = dict(params)
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            assert 'Link' not in response.headers
+            return pages
+        assert f'cursor={cursor}' in response.headers['Link']
+        assert response.headers['Link'].endswith('; rel="next"')
+        params['cursor'] = cursor
+
+
+def test_cursor_walk_covers_the_listing_exactly_once(client, category):
+    pages = walk(client, '/api/gallery', {'category': category, 'limit': 3})
+    assert [len(page) for page in pages] == [3, 3, 1]
+    walked = [row['id'] for page in pages for row in page]
+    # Items created within the same timestamp are still ordered consistently, by id
+    everything = client.get('/api/gallery', params={'category': category}).json()
+    assert walked == [row['id'] for row in everything]
+    assert len(set(walked)) == 7
+
+
+def test_last_page_exactly_full_has_no_next_cursor(client, category):
+    pages = walk(client, '/api/gallery', {'category': category, 'limit': 7})
+    assert [len(page) for page in pages] == [7]
+
+
+def test_link_header_follows_to_the_next_page(client, category):
+    first = client.get('/api/gallery', params={'category': category, 'limit': 4})
+    url = first.headers['Link'].split(';')[0].strip('<>')
+    second = client.get(url)
+    assert [row['id'] for row in second.json()] == [
+        row['id'] for row in client.get('/api/gallery', params={'category': category}).json()[4:]
+    ]
+
+
+def test_rows_created_mid_walk_do_not_shift_pages(client, admin_headers, category):
+    first = client.get('/api/gallery', params={'category': category, 'limit': 3})
+    item = {'title': 'Late arrival', 'image_url': 'https://example.com/late.jpg', 'category': category}
+    assert client.post('/api/gallery', json=item, headers=admin_headers).status_code == 200
+    rest = walk(client, '/api/gallery', {'category': category, 'limit': 3, 'cursor': first.headers['X-Next-Cursor']})
+    seen = [row['id'] for row in first.json()] + [row['id'] for page in rest for row in page]
+    assert len(seen) == len(set(seen))
+
+
+def test_field_projection(client, category):
+    rows = client.get('/api/gallery', params={'category': category, 'limit': 2, 'fields': 'title'}).json()
+    assert [set(row) for row in rows] == [{'title'}, {'title'}]
+    response = client.get('/api/gallery', params={'category': category, 'fields': 'title,nope'})
+    assert response.status_code == 400
+
+
+def test_projected_pages_still_carry_a_cursor(client, category):
+    pages = walk(client, '/api/gallery', {'category': category, 'limit': 3, 'fields': 'title'})
+    assert [len(page) for page in pages] == [3, 3, 1]
+
+
+@pytest.mark.parametrize('params', [{'limit': 0}, {'limit': server.MAX_PAGE_SIZE + 1}])
+def test_limit_is_bounded(client, params):
+    assert client.get('/api/gallery', params=params).status_code == 422
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get('/api/gallery', params={'limit': 2, 'cursor': 'not a cursor'}).status_code == 400
+
+
+def test_cursor_round_trip():
+    row = {'id': 'abc', 'created_at': '2024-01-01T00:00:00+00:00'}
+    assert server.decode_cursor(server.encode_cursor(row, 'created_at')) == ('2024-01-01T00:00:00+00:00', 'abc')
+
+
+def test_admin_listing_pages_by_default(client, admin_headers):
+    for n in range(3):
+        message = {'name': 'Pager', 'email': 'pager@example.com', 'message': f'Paging message {n}'}
+        assert client.post('/api/contact', json=message).status_code == 200
+    response = client.get('/api/contact', params={'limit': 2}, headers=admin_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    following = client.get('/api/contact', params={'limit': 2, 'cursor': response.headers['X-Next-Cursor']},
+                           headers=admin_headers)
+    assert not {row['id'] for row in response.json()} & {row['id'] for row in following.json()}
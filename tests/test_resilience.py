@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+class SlowStorage(server.StorageBackend):
+    name = 'slow'
+
+    async def select(self, table, *args, **kwargs):
+        await asyncio.sleep(10)
+        return []
+
+
+def open_breaker(reset: float = 0.05) -> server.CircuitBreaker:
+    breaker = server.CircuitBreaker(failures=1, reset=reset)
+    breaker.failure()
+    assert breaker.state == 'open'
+    return breaker
+
+
+def test_cancelled_trial_call_does_not_wedge_breaker():
+    async def scenario():
+        breaker = open_breaker()
+        resilient = server.ResilientStorage(SlowStorage(), breaker)
+        await asyncio.sleep(0.06)
+        assert breaker.state == 'half-open'
+
+        trial = asyncio.create_task(resilient.select('gallery'))
+        await asyncio.sleep(0)
+        assert breaker.trial
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        assert not breaker.trial
+        # The next call is let through as the new trial instead of being rejected
+        breaker.before()
+        assert breaker.trial
+
+    asyncio.run(scenario())
+
+
+def test_breaker_rejects_while_open():
+    breaker = open_breaker(reset=30)
+    with pytest.raises(server.StorageUnavailable) as excinfo:
+        breaker.before()
+    assert excinfo.value.status_code == 503
+    assert 'Retry-After' in excinfo.value.headers
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def spool_path(tmp_path):
+    return str(tmp_path / 'contact.spool')
+
+
+def rows(count, prefix='row'):
+    return [{'id': f'{prefix}-{n}', 'message': f'message {n}'} for n in range(count)]
+
+
+async def append_all(spool, new_rows):
+    for row in new_rows:
+        await spool.append(row)
+
+
+def test_flush_inserts_every_row_and_truncates_the_spool(memory_storage, spool_path):
+    spool = server.WriteBehindSpool('contact_messages', spool_path, batch_size=2)
+    asyncio.run(append_all(spool, rows(5)))
+    assert asyncio.run(spool.flush()) == 5
+    assert sorted(memory_storage.rows) == [f'row-{n}' for n in range(5)]
+    assert spool.path.stat().st_size == 0
+    assert spool._read_offset() == 0
+
+
+def test_replay_after_a_lost_checkpoint_is_exactly_once(memory_storage, spool_path, monkeypatch):
+    spool = server.WriteBehindSpool('contact_messages', spool_path, batch_size=2)
+    asyncio.run(append_all(spool, rows(5)))
+
+    # Crash after the second batch is inserted but before its offset is checkpointed
+    checkpoints = []
+    write_offset = spool._write_offset
+
+    def crash_on_second_checkpoint(offset):
+        if checkpoints:
+            raise OSError('crashed before checkpoint')
+        checkpoints.append(offset)
+        write_offset(offset)
+
+    monkeypatch.setattr(spool, '_write_offset', crash_on_second_checkpoint)
+    with pytest.raises(OSError):
+        asyncio.run(spool.flush())
+    assert len(memory_storage.rows) == 4
+
+    # The checkpoint is lost entirely, so the restarted worker replays from the start
+    spool.offset_path.unlink()
+    restarted = server.WriteBehindSpool('contact_messages', spool_path, batch_size=2)
+    assert asyncio.run(restarted.flush()) == 1
+    assert sorted(memory_storage.rows) == [f'row-{n}' for n in range(5)]
+    assert restarted.path.stat().st_size == 0
+
+
+def test_checkpoint_past_the_end_of_the_spool_is_reset(memory_storage, spool_path):
+    spool = server.WriteBehindSpool('contact_messages', spool_path, batch_size=10)
+    asyncio.run(append_all(spool, rows(3)))
+    spool.offset_path.write_text(str(spool.path.stat().st_size + 100))
+    assert spool._read_offset() == 0
+    assert asyncio.run(spool.flush()) == 3
+
+
+def test_torn_tail_line_is_dropped_on_restart(memory_storage, spool_path):
+    spool = server.WriteBehindSpool('contact_messages', spool_path, batch_size=10)
+    asyncio.run(append_all(spool, rows(3)))
+    with open(spool_path, 'ab') as f:
+        f.write(b'{"id": "torn", "mess')
+
+    restarted = server.WriteBehindSpool('contact_messages', spool_path, batch_size=10)
+    assert restarted.path.read_bytes().endswith(b'\n')
+    assert asyncio.run(restarted.flush()) == 3
+    assert 'torn' not in memory_storage.rows
+    assert len(memory_storage.rows) == 3
+
+
+def test_flush_stops_before_an_append_in_progress(memory_storage, spool_path):
+    spool = server.WriteBehindSpool('contact_messages', spool_path, batch_size=10)
+    asyncio.run(append_all(spool, rows(2)))
+    with open(spool_path, 'ab') as f:
+        f.write(b'{"id": "row-2", "mess')
+    assert asyncio.run(spool.flush()) == 2
+    # The partial line is neither consumed nor compacted away; once completed it is flushed
+    with open(spool_path, 'ab') as f:
+        f.write(b'age": "message 2"}\n')
+    assert asyncio.run(spool.flush()) == 1
+    assert sorted(memory_storage.rows) == ['row-0', 'row-1', 'row-2']
+    assert spool.path.stat().st_size == 0
+
+
+def test_compaction_while_another_writer_appends(memory_storage, spool_path):
+    flusher = server.WriteBehindSpool('contact_messages', spool_path, batch_size=7)
+    writer = server.WriteBehindSpool('contact_messages', spool_path, batch_size=7)
+    expected = rows(300)
+
+    def write_all():
+        # A second worker appending straight to the shared spool file
+        for row in expected:
+            writer._append(server.encode_json(row) + b'\n')
+
+    async def scenario():
+        appending = asyncio.create_task(asyncio.to_thread(write_all))
+        flushed = 0
+        while not appending.done():
+            flushed += await flusher.flush()
+            await asyncio.sleep(0)
+        await appending
+        return flushed + await flusher.flush()
+
+    assert asyncio.run(scenario()) == len(expected)
+    assert sorted(memory_storage.rows) == sorted(row['id'] for row in expected)
+    assert flusher.path.stat().st_size == 0
+
+
+def test_only_one_worker_drains_at_a_time(memory_storage, spool_path):
+    first = server.WriteBehindSpool('contact_messages', spool_path, batch_size=10)
+    second = server.WriteBehindSpool('contact_messages', spool_path, batch_size=10)
+    asyncio.run(append_all(first, rows(3)))
+    with server.file_lock(second.flush_lock_path):
+        assert asyncio.run(first.flush()) == 0
+    assert asyncio.run(second.flush()) == 3
+    assert memory_storage.inserts == 1
@@ -0,0 +1,45 @@
+import asyncio
+
+import server
+
+
+def heartbeat(client_name):
+    return server.StatusCheck(client_name=client_name).model_dump()
+
+
+def ingestor(coalesce):
+    return server.StatusIngestor(batch_size=10, max_buffer=100, coalesce=coalesce, max_clients=100)
+
+
+def test_coalescing_is_opt_in():
+    assert server.STATUS_COALESCE is False
+
+
+def test_without_coalescing_every_heartbeat_is_written(memory_storage):
+    buffer = ingestor(coalesce=False)
+    ids = [buffer.add(heartbeat('sensor'))['id'] for _ in range(3)]
+    assert asyncio.run(buffer.flush()) == 3
+    assert sorted(memory_storage.rows) == sorted(ids)
+
+
+def test_coalesced_heartbeats_share_the_stored_id(memory_storage):
+    buffer = ingestor(coalesce=True)
+    first = buffer.add(heartbeat('sensor'))
+    latest = buffer.add(heartbeat('sensor'))
+    other = buffer.add(heartbeat('gateway'))
+    assert latest['id'] == first['id']
+    assert asyncio.run(buffer.flush()) == 2
+    assert set(memory_storage.rows) == {first['id'], other['id']}
+    assert memory_storage.rows[first['id']]['timestamp'] == latest['timestamp']
+    assert buffer.summary()[-1] == {'client_name': 'sensor', 'count': 2, 'last_seen': latest['timestamp']}
+
+
+def test_coalescing_starts_afresh_after_a_flush(memory_storage):
+    buffer = ingestor(coalesce=True)
+    first = buffer.add(heartbeat('sensor'))
+    asyncio.run(buffer.flush())
+    second = buffer.add(heartbeat('sensor'))
+    assert second['id'] != first['id']
+    asyncio.run(buffer.flush())
+    assert set(memory_storage.rows) == {first['id'], second['id']}
+